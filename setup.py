@@ -6,8 +6,12 @@ setup(
     packages=find_packages(),
     install_requires=[
         'numpy',
+        'scipy',
         'matplotlib',
         'pyyaml',
         'tqdm'
     ],
+    extras_require={
+        'numba': ['numba'],
+    },
 )
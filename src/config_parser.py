@@ -1,11 +1,26 @@
+import copy
 import yaml
+from collections import OrderedDict
 from pathlib import Path
 import logging
 
+# Use the libyaml based loader when available, it accepts the same documents as the pure Python one
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# Parsed configuration files keyed by path, with the modification time and size they were parsed at
+_cache = OrderedDict()
+_CACHE_SIZE = 100
+
 def load_config(config_filename: Path):
     """
     Load the main config file for all settings.
 
+    Parsed files are cached and reused for as long as their modification time and size are unchanged.
+    A deep copy is returned so that callers can modify the configuration without affecting the cache.
+
     Parameters:
     config_filename (Path): The file path of the configuration file.
 
@@ -13,8 +28,20 @@ def load_config(config_filename: Path):
     dict: Parsed YAML file as a dictionary.
     """
     try:
+        st = Path(config_filename).stat()
+        key = str(config_filename)
+        entry = _cache.get(key)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            _cache.move_to_end(key)
+            return copy.deepcopy(entry[2])
+
         with open(config_filename, "r") as f:
-            return yaml.safe_load(f)
+            config = yaml.load(f, Loader=_Loader)
+        _cache[key] = (st.st_mtime_ns, st.st_size, config)
+        _cache.move_to_end(key)
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+        return copy.deepcopy(config)
     except FileNotFoundError:
         logging.error(f"File {config_filename} not found.")
         return None
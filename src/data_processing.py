@@ -2,26 +2,85 @@
 This module is responsible for reading data from files and processing it.
 This includes parsing and cleaning the dataset.
 """
+import logging
+import os
 import numpy as np
+from pathlib import Path
 
 def fetch_data_from_dataset(file_path):
     """
     Reads data from the given file_path and extracts laser and odometry data.
+
+    FLASER lines holding fewer values than they announce are skipped with a warning.
     
     :param file_path: The path to the data file to be read.
-    :return: Two numpy arrays containing the laser data and odometry data.
+    :return: Two float32 numpy arrays containing the laser data and odometry data.
     """
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
     laser_data = []
     odometry_data = []
     
-    for line in lines:
-        if line.startswith('FLASER'):
-            line = line.strip().split()
-            num_laser_values = int(line[1])  # Extracting number of laser values
-            values = line[2:]  # Extracting laser and odometry values
-            laser_data.append([float(value) for value in values[:num_laser_values]])
-            odometry_data.append([float(value) for value in values[num_laser_values:num_laser_values+3]])
+    # Stream the file line by line and parse each scan with a single numpy call
+    with open(file_path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.startswith('FLASER'):
+                continue
+            fields = line.split()
+            num_laser_values = int(fields[1])  # Extracting number of laser values
+            num_values = num_laser_values + 3  # Laser values followed by the odometry
+            if len(fields) < 2 + num_values:
+                # Typically the last line of a log that was cut off while being written
+                logging.warning(f"Skipping truncated FLASER line {line_number} in {file_path}")
+                continue
+            # Let numpy convert the strings in one call, which also rejects any non-numeric value
+            values = np.array(fields[2:2 + num_values], dtype=np.float32)
+            laser_data.append(values[:num_laser_values])
+            odometry_data.append(values[num_laser_values:])
     
-    return np.array(laser_data), np.array(odometry_data)
\ No newline at end of file
+    return np.array(laser_data, dtype=np.float32), np.array(odometry_data, dtype=np.float32)
+
+def _save_npy_atomic(path, array):
+    """
+    Saves an array as a .npy file, so that an interrupted run never leaves a partially written file.
+
+    The array is written to a temporary file next to the target, which then replaces the target.
+
+    :param path: The path of the .npy file.
+    :param array: The array to be saved.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+def load_dataset(file_path):
+    """
+    Returns the laser and odometry data of the given dataset, using a binary cache next to it.
+
+    The first time a dataset is read it is parsed with fetch_data_from_dataset and both arrays are saved 
+    as .npy files. Later runs memory map these files instead of parsing the text again, for as long as 
+    they are newer than the dataset. The arrays are mapped copy-on-write, so they can be modified in 
+    memory without changing the cache. A cache that cannot be read is rebuilt from the dataset.
+
+    :param file_path: The path to the data file to be read.
+    :return: Two float32 numpy arrays containing the laser data and odometry data.
+    """
+    file_path = Path(file_path)
+    laser_npy = file_path.with_suffix('.laser.npy')
+    odometry_npy = file_path.with_suffix('.odometry.npy')
+    source_mtime = file_path.stat().st_mtime_ns
+    if all(p.is_file() and p.stat().st_mtime_ns >= source_mtime for p in (laser_npy, odometry_npy)):
+        try:
+            return np.load(laser_npy, mmap_mode='c'), np.load(odometry_npy, mmap_mode='c')
+        except (OSError, ValueError) as exc:
+            logging.warning(f"Rebuilding unreadable cache of dataset {file_path}: {exc}")
+
+    laser, odometry = fetch_data_from_dataset(file_path)
+    try:
+        _save_npy_atomic(laser_npy, laser)
+        _save_npy_atomic(odometry_npy, odometry)
+    except OSError as exc:
+        logging.warning(f"Could not cache dataset {file_path}: {exc}")
+    return laser, odometry
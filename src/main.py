@@ -1,6 +1,7 @@
 import logging
+import numpy as np
 from config_parser import load_config
-from data_processing import fetch_data_from_dataset
+from data_processing import load_dataset
 from map_operations import initialise_map
 from map_operations import process_odometry_and_laser_data
 from pathlib import Path
@@ -21,7 +22,8 @@ def main():
     # Load configuration and dataset
     config = load_config(config_path)
     dataset_path = parent_dir / config["dataset"]["dir"] / config["dataset"]["map1"]
-    laser, odometry = fetch_data_from_dataset(dataset_path)
+    laser, odometry = load_dataset(dataset_path)
+    np.clip(laser, 0, config["laser"]["max_range"], out=laser)  # Limit the sensor readings to the max range
 
     # Initialise the map and process the data
     map = initialise_map(config, odometry)
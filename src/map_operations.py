@@ -1,7 +1,6 @@
 from occupancy import OccupancyGrid
-from plot_operations import plot_map
+from plot_operations import MapPlotter, save_map
 import matplotlib.pyplot as plt
-import numpy as np
 from tqdm import tqdm
 
 def initialise_map(config, odometry):
@@ -24,19 +23,29 @@ def initialise_map(config, odometry):
 def process_odometry_and_laser_data(config, odometry, laser, map):
     """
     Processes odometry and laser data and updates the map.
+
+    With a live plot the map is drawn every ``plot_every_n`` (at least 1) iterations and on the last 
+    one. Without it, no figure is created and only the final map is saved.
     
     :param config: The configuration directory.
     :param odometry: The odometry data array.
-    :param laser: The laser data array.
+    :param laser: The laser data array, limited to the laser's max range.
     :param map: The OccupancyGrid object to be updated.
     """
-    plt.figure(1)
-    plt.ion()
-    laser_range = config["laser"]["max_range"]
-    laser = np.clip(laser, 0, laser_range)  # Limit the sensor readings to the max range
+    live_plot = config["plot"]["live"]
+    plot_every_n = int(config["plot"]["plot_every_n"])
+    if plot_every_n < 1:
+        raise ValueError(f"plot_every_n must be at least 1, got {plot_every_n}")
+    if live_plot:
+        plt.ion()
+        plotter = MapPlotter(config, map)
 
     # Loop through each odometry and laser data point to update the map
     for i in tqdm(range(len(odometry)), desc="Processing data"):
         # Your data processing code here
         map.update(odometry[i], laser[i])
-        plot_map(config, odometry, laser, map, i)
\ No newline at end of file
+        if live_plot and (i % plot_every_n == 0 or i == len(odometry) - 1):
+            plotter.plot_map(odometry, i)
+
+    if not live_plot:
+        save_map(config, map)
\ No newline at end of file
@@ -1,4 +1,9 @@
 import numpy as np
+from scipy.special import expit
+try:
+    from raycast_nb import trace_rays
+except ImportError:  # Numba is optional, the rays are then filled with vectorized numpy instead
+    trace_rays = None
 
 class OccupancyGrid:
     """Represents an occupancy grid for robotic mapping."""
@@ -12,7 +17,23 @@ class OccupancyGrid:
         self.config = config
         self.resolution = self.config["map"]["resolution"]
         self.probability = self.config["map"]["prob_occ"]
-        self.log_prob_map = np.zeros([map_size[0] * self.resolution + 1, map_size[1] * self.resolution + 1], dtype=float)
+        self.log_odds_min = self.config['map']['log_odds_min']
+        self.log_odds_max = self.config['map']['log_odds_max']
+        self.sensor_model = self.config["map"]["sensor_model"]
+        # The map is stored as one contiguous array indexed by linear cell ids, log_prob_map is a 2D view of it
+        shape = (map_size[0] * self.resolution + 1, map_size[1] * self.resolution + 1)
+        self._nx, self._ny = shape
+        self.log_prob_map_flat = np.zeros(shape[0] * shape[1], dtype=np.float32)
+        self.log_prob_map = self.log_prob_map_flat.reshape(shape)
+        # Log odds increments are constant for the grid, so compute them once
+        A, B = self.probability, 1 - self.probability
+        self._l_occ = np.float32(np.log(B / A))
+        self._l_free = np.float32(np.log(A / B))
+        # Output buffer of fetch_prob_map, reused so that no map sized temporaries are allocated per call
+        self._prob_buf = np.empty_like(self.log_prob_map)
+        # Cosine and sine of the beam angles, allocated on the first laser sweep once the beam count is known
+        self._cos_beam = None
+        self._sin_beam = None
 
     def fetch_prob_map(self):
         """
@@ -31,60 +52,43 @@ class OccupancyGrid:
         where `x` is the log odds value. This function takes a real-valued input (the log odds) and 
         outputs a value between 0 and 1 (the probability).
 
+        The log odds are kept within the configured bounds by update, so no clipping is needed here. The 
+        logistic function is computed in a buffer owned by the grid, which is overwritten by the next call.
+
         :return: A 2D numpy array where each cell's value is the probability that the cell is occupied.
         """
-        log_odds_min = self.config['map']['log_odds_min']
-        log_odds_max = self.config['map']['log_odds_max']
-        clipped_log_odds = np.clip(self.log_prob_map, log_odds_min, log_odds_max)
-        return 1 - 1 / (1 + np.exp(clipped_log_odds))
+        return expit(self.log_prob_map, out=self._prob_buf)
 
     def add_prob(self, occupied):
         """
         Returns the log odds for a cell being occupied or free.
 
+        The values are precomputed when the grid is created.
+
         :param occupied: A boolean indicating if the cell is occupied (True) or free (False).
         :return: Log odds of the cell being occupied or free.
         """
-        A, B = self.probability, 1 - self.probability
-        return np.log(A / B) if not occupied else np.log(B / A)
-
-    def bresenham_line(self, x0, y0, x1, y1):
-        """
-        Returns the grid cells between two points in the occupancy grid map using the Bresenham's line algorithm.
-
-        :param x0, y0: The coordinates of the first point.
-        :param x1, y1: The coordinates of the second point.
-
-        :return: A 2D array where each row represents the (x, y) coordinates of a cell in the occupancy 
-                grid that lies on the line between the start and end point.
-        """
-        points = []
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        x, y = x0, y0
-        sx = -1 if x0 > x1 else 1
-        sy = -1 if y0 > y1 else 1
-        if dx > dy:
-            err = dx / 2.0
-            while x != x1:
-                points.append((x, y))
-                err -= dy
-                if err < 0:
-                    y += sy
-                    err += dx
-                x += sx
-        else:
-            err = dy / 2.0
-            while y != y1:
-                points.append((x, y))
-                err -= dx
-                if err < 0:
-                    x += sx
-                    err += dy
-                y += sy        
-        points.append((x, y))
-        return np.array(points)
-        
+        return self._l_occ if occupied else self._l_free
+
+    def beam_directions(self, theta, num_beams):
+        """
+        Returns the direction of each laser beam in the global frame for the given robot heading.
+
+        The beam angles are the same for every scan, so their cosine and sine are cached and rotated by the 
+        robot heading with the angle addition identities instead of evaluating the trigonometric functions 
+        for every beam.
+
+        :param theta: The orientation of the robot.
+        :param num_beams: The number of laser beams, evenly distributed in the range (-pi/2, pi/2).
+
+        :return: The cosine and sine of the global angle of each beam.
+        """
+        if self._cos_beam is None or len(self._cos_beam) != num_beams:
+            beam_angles = np.linspace(-np.pi/2, np.pi/2, num_beams, axis=-1)
+            self._cos_beam, self._sin_beam = np.cos(beam_angles).astype(np.float32), np.sin(beam_angles).astype(np.float32)
+        c, s = np.cos(theta), np.sin(theta)
+        return c * self._cos_beam - s * self._sin_beam, s * self._cos_beam + c * self._sin_beam
+
     def laser_sweep(self, xi, zi):
         """
         Performs a laser sweep around the current robot pose.
@@ -104,8 +108,8 @@ class OccupancyGrid:
 
         :return: A 2D array where each column is a point (x, y) in the global frame where a laser beam hit an obstacle.
         """
-        theta = np.linspace(-np.pi/2, np.pi/2, len(zi), axis=-1)
-        return [xi[0] + zi * np.cos(xi[2] + theta), xi[1] + zi * np.sin(xi[2] + theta)]
+        cos_beam, sin_beam = self.beam_directions(xi[2], len(zi))
+        return [xi[0] + zi * cos_beam, xi[1] + zi * sin_beam]
 
     def check_cells(self, xi, zi):
         """
@@ -117,8 +121,8 @@ class OccupancyGrid:
         occupied. All cells between the robot's current position and these hit cells are considered free, 
         since the laser would have to pass through these cells to reach the hit cells.
 
-        Both sets of cells (occupied and free) are rounded to the nearest integer to fit on a discrete 
-        grid, which is then multiplied by the map resolution to convert to the map's scale. 
+        The robot position and the laser readings are scaled to the map's resolution once, and the sweep 
+        is then carried out in the grid frame by _check_cells_grid.
 
         :param xi: The current pose of the robot [x, y, theta].
         :param zi: The laser readings.
@@ -128,20 +132,109 @@ class OccupancyGrid:
                 between the robot's current position and the occupied cells, i.e., the cells that the 
                 laser must have passed through to reach the occupied cells, thus indicating they are free.
         """
-        # Round the laser readings to get the occupied cells
-        occ = np.round(np.array(self.laser_sweep(xi, zi)) * self.resolution).astype(int)
+        occ, free, _ = self._check_cells_grid(xi[:2] * self.resolution, xi[2], zi * self.resolution)
+        return occ, free
+
+    def _check_cells_grid(self, xi_g, theta, zi_g):
+        """
+        Checks which cells are occupied or free, with the robot position and laser readings in grid units.
 
-        # Round the robot pose to get the current cell
-        xi = np.round(xi * self.resolution).astype(int)
+        :param xi_g: The position of the robot [x, y] scaled to the map's resolution.
+        :param theta: The orientation of the robot.
+        :param zi_g: The laser readings scaled to the map's resolution.
 
-        # Initialize a list of free cells
-        free = np.array([[xi[0], xi[0]], [xi[1], xi[1]]])
+        :return: The occupied and the free cells, as returned by check_cells, followed by the offsets of 
+                each beam's cells within the free cells.
+        """
+        # Round the beam end points to get the occupied cells
+        cos_beam, sin_beam = self.beam_directions(theta, len(zi_g))
+        occ = np.array([np.round(xi_g[0] + zi_g * cos_beam), np.round(xi_g[1] + zi_g * sin_beam)]).astype(np.int32)
 
-        # Add all cells between the robot and each occupied cell to the list of free cells
-        for i in range(len(zi)):
-            free = np.hstack((free, self.bresenham_line(xi[0], xi[1], occ[0][i], occ[1][i]).T))
+        # Round the robot position to get the current cell
+        xi_g = np.round(xi_g).astype(np.int32)
 
-        return occ, free
+        # Every beam covers max(|dx|, |dy|) + 1 cells, which gives each beam its own slice of the buffer
+        lengths = np.maximum(np.abs(occ[0] - xi_g[0]), np.abs(occ[1] - xi_g[1])) + 1
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int32)
+        np.cumsum(lengths, out=offsets[1:])
+
+        # Trace all cells between the robot and each occupied cell into the preallocated buffer
+        if trace_rays is not None:
+            free = np.empty((2, offsets[-1]), dtype=np.int32)
+            trace_rays(xi_g[0], xi_g[1], occ[0], occ[1], offsets, free[0], free[1])
+        else:
+            free = self.cells_between_points(xi_g[0], xi_g[1], occ, lengths)
+
+        return occ, free, offsets
+
+    def cells_between_points(self, x0, y0, occ, lengths):
+        """
+        Returns the grid cells between the robot and each occupied cell, for all laser beams at once.
+
+        This is the closed form of the Bresenham line traced by the Numba kernel, so both produce the same 
+        cells. A beam takes one step per cell along its major axis. After j steps, the error term of the 
+        Bresenham algorithm has moved the minor axis by ceil((j * minor - major / 2) / major) cells. All 
+        beams are stepped together on a (beams x longest beam) array, and the steps past the end of the 
+        shorter beams are masked out.
+
+        :param x0, y0: The cell of the robot.
+        :param occ: The occupied cells, one column per laser beam.
+        :param lengths: The number of cells covered by each beam, max(|dx|, |dy|) + 1.
+
+        :return: A 2D array with the (x, y) coordinates of the cells of every beam, the beams following 
+                each other in order.
+        """
+        dx, dy = np.abs(occ[0] - x0), np.abs(occ[1] - y0)
+        major, minor = np.maximum(dx, dy)[:, None], np.minimum(dx, dy)[:, None]
+        x_major = (dx > dy)[:, None]  # Ties step along y, as in the kernel
+
+        steps = np.arange(lengths.max(), dtype=np.int32)[None, :]
+        mask = steps < lengths[:, None]
+        # Minor axis offset after each step, single cell beams stay on the robot cell
+        minor_steps = np.maximum((2 * steps * minor + major - 1) // np.maximum(2 * major, 1), 0)
+
+        xs = x0 + np.sign(occ[0] - x0)[:, None] * np.where(x_major, steps, minor_steps)
+        ys = y0 + np.sign(occ[1] - y0)[:, None] * np.where(x_major, minor_steps, steps)
+        return np.array([xs[mask], ys[mask]]).astype(np.int32)
+
+    def project_cells(self, xi, zi):
+        """
+        Classifies the cells around the robot as occupied or free by projecting them into the laser scan.
+
+        Instead of tracing each laser beam through the grid, every cell within the laser range of the robot 
+        is visited once. The cell's polar coordinates (r, phi) relative to the robot pose are computed and 
+        the laser beam closest to phi is looked up. A cell is free if it lies in front of the measured 
+        range of that beam, and occupied if it lies within half a cell of it. All remaining cells are 
+        unknown and left untouched. Since every cell is classified exactly once there are no duplicate 
+        writes, and the whole scan is handled in a single vectorized pass.
+
+        :param xi: The current pose of the robot [x, y, theta].
+        :param zi: The laser readings.
+
+        :return: A tuple containing the window of the map around the robot as a pair of slices, followed 
+                by two boolean masks over that window marking the occupied and the free cells.
+        """
+        x, y = xi[0] * self.resolution, xi[1] * self.resolution
+        max_range = self.config["laser"]["max_range"] * self.resolution
+
+        # Restrict the projection to the bounding box of the laser range that lies within the map
+        x_lo, x_hi = max(int(np.floor(x - max_range)), 0), min(int(np.ceil(x + max_range)) + 1, self.log_prob_map.shape[0])
+        y_lo, y_hi = max(int(np.floor(y - max_range)), 0), min(int(np.ceil(y + max_range)) + 1, self.log_prob_map.shape[1])
+        xs, ys = np.meshgrid(np.arange(x_lo, x_hi, dtype=np.float32) - x,
+                             np.arange(y_lo, y_hi, dtype=np.float32) - y, indexing='ij')
+
+        # Polar coordinates of each cell relative to the robot, with the angle wrapped to [-pi, pi)
+        r = np.hypot(xs, ys)
+        phi = (np.arctan2(ys, xs) - xi[2] + np.pi) % (2 * np.pi) - np.pi
+
+        # Index of the laser beam closest to each cell, the beams being spread evenly over [-pi/2, pi/2]
+        k = np.round((phi + np.pi / 2) / np.pi * (len(zi) - 1)).astype(np.int32)
+        mask = (k >= 0) & (k < len(zi)) & (r <= max_range)
+        z = zi[np.clip(k, 0, len(zi) - 1)] * self.resolution
+
+        occ_mask = mask & (np.abs(r - z) < 0.5)
+        free_mask = mask & (r < z - 0.5)
+        return (slice(x_lo, x_hi), slice(y_lo, y_hi)), occ_mask, free_mask
 
     def update(self, xi, zi):
         """
@@ -156,11 +249,37 @@ class OccupancyGrid:
         Bayesian update of the cell's occupancy probability, since log odds are additive in the same way 
         that probabilities are multiplicative.
 
+        The increments of all cells are gathered in one signed array, where the last cell of each beam, its 
+        occupied cell, receives both the occupied and the free increment. They are accumulated with a 
+        single ``np.add.at`` so that cells appearing several times in a scan (e.g. the robot cell shared by 
+        every beam) receive one update per occurrence.
+
+        With the ``projection`` sensor model the cells are classified by ``project_cells`` instead, which 
+        touches every cell at most once.
+
+        Cells of beams that leave the map are ignored. The updated cells are clipped to the configured log 
+        odds bounds, so that the map stays within them and no cell saturates beyond the point where a few 
+        contrary readings can change it again.
+
         :param xi: The current pose of the robot [x, y, theta].
         :param zi: The laser readings.
         """
-        occ, free = self.check_cells(xi, zi)
-        for i in range(occ.shape[1]):
-            self.log_prob_map[occ[0][i], occ[1][i]] += self.add_prob(True)
-        for i in range(free.shape[1]):
-            self.log_prob_map[free[0][i], free[1][i]] += self.add_prob(False)
+        if self.sensor_model == 'projection':
+            window, occ_mask, free_mask = self.project_cells(xi, zi)
+            log_prob_window = self.log_prob_map[window]
+            log_prob_window[occ_mask] += self._l_occ
+            log_prob_window[free_mask] += self._l_free
+            np.clip(log_prob_window, self.log_odds_min, self.log_odds_max, out=log_prob_window)
+            return
+
+        _, free, offsets = self._check_cells_grid(xi[:2] * self.resolution, xi[2], zi * self.resolution)
+        delta = np.full(free.shape[1], self._l_free, dtype=np.float32)
+        delta[offsets[1:] - 1] += self._l_occ
+
+        # Drop the cells of beams leaving the map, since out of range ids would wrap into other rows
+        inside = (free[0] >= 0) & (free[0] < self._nx) & (free[1] >= 0) & (free[1] < self._ny)
+        lin = free[0][inside] * self._ny + free[1][inside]
+        np.add.at(self.log_prob_map_flat, lin, delta[inside])
+
+        # Every beam ends on its occupied cell, so the free cells cover all cells touched by the scan
+        self.log_prob_map_flat[lin] = np.clip(self.log_prob_map_flat[lin], self.log_odds_min, self.log_odds_max)
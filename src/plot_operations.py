@@ -1,6 +1,5 @@
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from matplotlib.animation import FuncAnimation
 import numpy as np
 from pathlib import Path
 """
@@ -8,48 +7,122 @@ This module is responsible for operations related to plotting.
 This includes generating a plot based on the OccupancyGrid map and data.
 """
 
-def plot_map(config, odometry, laser, map, i):
+def fetch_output_filename(config):
     """
-    Plots the map after processing each odometry and laser data point.
-    
+    Returns the path the final map is saved to.
+
     :param config: The configuration directory.
-    :param odometry: The odometry data array.
-    :param laser: The laser data array.
-    :param map: The OccupancyGrid object to be plotted.
-    :param i: The current index in the odometry and laser data arrays.
+    :return: The path of the output file relative to the repository root.
     """
     parent_dir = Path(__file__).resolve().parent.parent
-    output_name = parent_dir / config['plot']['plot_output_filename']
-    resolution = config['map']['resolution']
-    plt.clf()  # Clear the current figure.
+    return parent_dir / config['plot']['plot_output_filename']
+
+def save_map(config, map):
+    """
+    Saves the map as an image without creating a figure, for runs without a live plot.
+
+    :param config: The configuration directory.
+    :param map: The OccupancyGrid object to be saved.
+    """
+    output_name = fetch_output_filename(config)
+    print("Saving the map to path {}".format(output_name))
+    plt.imsave(output_name, map.fetch_prob_map().T, cmap='gray', origin='lower', vmin=0, vmax=1)
+
+class MapPlotter:
+    """Live plot of the OccupancyGrid map that reuses its figure and artists between frames."""
+
+    def __init__(self, config, map):
+        """
+        Initializes the plotter. The figure itself is created on the first call to plot_map.
 
-    # Set plot limits based on the map size
-    plt.xlim(0, config['map']['size'][0] * resolution)
-    plt.ylim(0, config['map']['size'][1] * resolution)
+        :param config: The configuration directory.
+        :param map: The OccupancyGrid object to be plotted.
+        """
+        self.config = config
+        self.map = map
+        self.resolution = config['map']['resolution']
+        self.fig = None
+        self.background = None
 
-    if i != len(odometry) - 1:  # If it's not the last iteration, plot the robot and Lidar.
-        # Create a wedge (half-circle) representing the LIDAR's field of view
-        pos = odometry[i] * resolution # Compute the robot's position with the resolution taken into account.
-        theta = odometry[i, 2]  # Robot's heading angle
+    def _create_figure(self):
+        """
+        Creates the figure with the map image, the LIDAR's field of view and the robot.
 
-        # Adjust the radius of the wedge according to the resolution
-        wedge_radius = config["laser"]["max_range"] * resolution
+        All three artists are animated, so they are left out of regular draws and drawn on top of the
+        cached background with blitting instead.
+        """
+        self.fig = plt.figure(1)
+        self.fig.clf()
+        self.ax = self.fig.gca()
 
-        lidar_fov = patches.Wedge(center=(pos[0], pos[1]), r=wedge_radius, 
-                                  theta1=np.degrees(theta - np.pi/2), 
-                                  theta2=np.degrees(theta + np.pi/2), 
-                                  color=config['plot']['lidar_color'], alpha=config['plot']['lidar_alpha'])  
+        # Set plot limits based on the map size
+        self.ax.set_xlim(0, self.config['map']['size'][0] * self.resolution)
+        self.ax.set_ylim(0, self.config['map']['size'][1] * self.resolution)
+
+        # Display the occupancy grid map with a grayscale colormap, origin at the lower left corner.
+        self.im = self.ax.imshow(np.zeros_like(self.map.log_prob_map).T, cmap='gray', origin='lower',
+                                 vmin=0, vmax=1, animated=True)
+
+        # Create a wedge (half-circle) representing the LIDAR's field of view, with the radius adjusted
+        # according to the resolution.
+        self.lidar_fov = patches.Wedge(center=(0, 0), r=self.config["laser"]["max_range"] * self.resolution,
+                                       theta1=-90, theta2=90, color=self.config['plot']['lidar_color'],
+                                       alpha=self.config['plot']['lidar_alpha'], animated=True)
 
         # Create a circle representing the robot.
-        rob = patches.Circle((pos[0], pos[1]), resolution, fc=config['plot']['robot_color'])  
+        self.rob = patches.Circle((0, 0), self.resolution, fc=self.config['plot']['robot_color'], animated=True)
+
+        self.ax.add_patch(self.lidar_fov)
+        self.ax.add_patch(self.rob)
+
+        # Recapture the background whenever the figure is fully redrawn, e.g. after a resize.
+        self.draw_cid = self.fig.canvas.mpl_connect('draw_event', self._capture_background)
+        plt.show(block=False)
+        self.fig.canvas.draw()
+
+    def _capture_background(self, event):
+        """
+        Stores the static part of the figure to restore before drawing the animated artists.
+
+        :param event: The matplotlib draw event.
+        """
+        self.background = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+
+    def plot_map(self, odometry, i):
+        """
+        Plots the map after processing each odometry and laser data point.
+
+        :param odometry: The odometry data array.
+        :param i: The current index in the odometry and laser data arrays.
+        """
+        if self.fig is None:
+            self._create_figure()
+        self.im.set_data(self.map.fetch_prob_map().T)
 
-        plt.gca().add_patch(lidar_fov)
-        plt.gca().add_patch(rob)
+        if i != len(odometry) - 1:  # If it's not the last iteration, plot the robot and Lidar.
+            pos = odometry[i] * self.resolution # Compute the robot's position with the resolution taken into account.
+            theta = odometry[i, 2]  # Robot's heading angle
 
-    # Display the occupancy grid map with a grayscale colormap, origin at the lower left corner.
-    plt.imshow(map.fetch_prob_map().T, cmap='gray', origin='lower')
-    plt.pause(config['plot']['liveplot_speed'])  # Pause to update the figure.
+            self.lidar_fov.set_center((pos[0], pos[1]))
+            self.lidar_fov.set_theta1(np.degrees(theta - np.pi/2))
+            self.lidar_fov.set_theta2(np.degrees(theta + np.pi/2))
+            self.rob.set_center((pos[0], pos[1]))
 
-    if i == len(odometry) - 1:  # If it is the last iteration, save the figure.
-        print("Saving the figure to path {}".format(output_name))
-        plt.savefig(output_name)  # Save the figure to a file.
\ No newline at end of file
+            # Blit the updated artists on top of the cached background.
+            canvas = self.fig.canvas
+            canvas.restore_region(self.background)
+            self.ax.draw_artist(self.im)
+            self.ax.draw_artist(self.lidar_fov)
+            self.ax.draw_artist(self.rob)
+            canvas.blit(self.ax.bbox)
+            canvas.flush_events()
+            canvas.start_event_loop(self.config['plot']['liveplot_speed'])  # Pause to update the figure.
+        else:  # If it is the last iteration, save the figure without the robot and Lidar.
+            output_name = fetch_output_filename(self.config)
+            self.fig.canvas.mpl_disconnect(self.draw_cid)
+            self.lidar_fov.set_visible(False)
+            self.rob.set_visible(False)
+            self.im.set_animated(False)
+            self.fig.canvas.draw()
+            print("Saving the figure to path {}".format(output_name))
+            self.fig.savefig(output_name)  # Save the figure to a file.
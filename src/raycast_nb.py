@@ -0,0 +1,67 @@
+"""
+This module contains the Numba compiled ray tracing kernels.
+It traces the grid cells covered by each laser beam without leaving compiled code.
+"""
+from numba import njit, prange
+
+
+@njit(cache=True)
+def _bresenham_fill(x0, y0, x1, y1, out_x, out_y, idx):
+    """
+    Writes the grid cells between two points into the output buffers using Bresenham's line algorithm.
+
+    :param x0, y0: The coordinates of the first point.
+    :param x1, y1: The coordinates of the second point.
+    :param out_x, out_y: The buffers receiving the x and y coordinates of the cells.
+    :param idx: The position in the buffers where the first cell is written.
+
+    :return: The position in the buffers following the last written cell.
+    """
+    dx = abs(x1 - x0)
+    dy = abs(y1 - y0)
+    x, y = x0, y0
+    sx = -1 if x0 > x1 else 1
+    sy = -1 if y0 > y1 else 1
+    if dx > dy:
+        err = dx / 2.0
+        while x != x1:
+            out_x[idx] = x
+            out_y[idx] = y
+            idx += 1
+            err -= dy
+            if err < 0:
+                y += sy
+                err += dx
+            x += sx
+    else:
+        err = dy / 2.0
+        while y != y1:
+            out_x[idx] = x
+            out_y[idx] = y
+            idx += 1
+            err -= dx
+            if err < 0:
+                x += sx
+                err += dy
+            y += sy
+    out_x[idx] = x
+    out_y[idx] = y
+    return idx + 1
+
+
+@njit(parallel=True, cache=True)
+def trace_rays(x0, y0, occ_x, occ_y, offsets, out_x, out_y):
+    """
+    Writes the grid cells covered by every laser beam starting at the robot cell into the output buffers.
+
+    Beam ``i`` is written to the slice ``offsets[i]:offsets[i + 1]`` of the buffers, so the offsets
+    must hold the cumulative number of cells of each beam, i.e. ``max(|dx|, |dy|) + 1``. As the slices
+    are disjoint the beams are traced in parallel without any synchronisation.
+
+    :param x0, y0: The cell of the robot.
+    :param occ_x, occ_y: The cells where the laser beams hit an obstacle.
+    :param offsets: The start position of each beam in the buffers, followed by the total cell count.
+    :param out_x, out_y: The int32 buffers receiving the x and y coordinates of the cells.
+    """
+    for i in prange(occ_x.shape[0]):
+        _bresenham_fill(x0, y0, occ_x[i], occ_y[i], out_x, out_y, offsets[i])
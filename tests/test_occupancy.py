@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# The modules in src import each other by their plain names
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config_parser import load_config
+from occupancy import OccupancyGrid
+
+CONFIG_FILENAME = Path(__file__).resolve().parent.parent / "config" / "config.yaml"
+
+
+def test_numpy_fill_matches_numba_kernel():
+    """The numpy fallback must trace exactly the cells of the Numba Bresenham kernel."""
+    trace_rays = pytest.importorskip("raycast_nb").trace_rays
+    grid = OccupancyGrid([100, 100], load_config(CONFIG_FILENAME))
+    rng = np.random.default_rng(0)
+
+    for _ in range(100):
+        x0, y0 = np.int32(rng.integers(0, 100)), np.int32(rng.integers(0, 100))
+        occ = rng.integers(-20, 120, (2, 181)).astype(np.int32)
+        # Include single cell beams and beams along the axes and diagonals
+        occ[:, 0] = x0, y0
+        occ[:, 1] = x0 + 7, y0
+        occ[:, 2] = x0, y0 - 7
+        occ[:, 3] = x0 - 7, y0 + 7
+        lengths = np.maximum(np.abs(occ[0] - x0), np.abs(occ[1] - y0)) + 1
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int32)
+        np.cumsum(lengths, out=offsets[1:])
+
+        free = np.empty((2, offsets[-1]), dtype=np.int32)
+        trace_rays(x0, y0, occ[0], occ[1], offsets, free[0], free[1])
+
+        np.testing.assert_array_equal(grid.cells_between_points(x0, y0, occ, lengths), free)